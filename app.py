@@ -8,25 +8,260 @@
 
 # Import necessary libraries
 import requests  # For making HTTP requests to external APIs (OpenWeatherMap)
+import functools # For caching geocoding results in-process
+import copy      # For handing out independent copies of cached API responses
+import cachetools # For the short-TTL weather response cache
+import numpy as np # For vectorized batch temperature/comfort computation
 import logging   # For logging application events and errors
 import os        # For accessing environment variables (like the API key)
 import sqlite3   # For interacting with the SQLite database
-from flask import Flask, render_template, request, jsonify # Flask core, template rendering, request handling, JSON responses
+import threading # For per-thread reusable database connections
+import atexit    # For refreshing SQLite planner statistics at shutdown
+from urllib.parse import quote # For URL-encoding the geocode query string
+import re        # For validating location queries before any API call
+from concurrent.futures import ThreadPoolExecutor # For parallel per-city API fetches
+import orjson    # Fast C JSON serializer used for all API responses
+import gzip      # For precompressing the cached history page
+import itertools # For re-chaining the peeked history row ahead of its cursor
+import jinja2    # For the template bytecode cache configured below
+import markupsafe # For C-speed escaping when pre-serializing history rows
+from flask import Flask, render_template, request, jsonify, Response # Flask core, template rendering, request handling, JSON/raw responses
+from flask.json.provider import JSONProvider # Base class for the orjson provider below
 from datetime import datetime # For timestamping database records (though CURRENT_TIMESTAMP is used in SQL)
+from dataclasses import dataclass # For the parsed OWM payload structure
+from typing import Optional # For optional fields in the parsed payload
 
 # Configure basic logging settings
 # Logs will include timestamp, log level, and the message.
 # INFO level means INFO, WARNING, ERROR, and CRITICAL messages will be shown.
 logging.basicConfig(level=logging.INFO, format="%(asctime)s - %(levelname)s - %(message)s")
 
+# OpenWeatherMap API key, read from the environment once at import instead
+# of on every request (os.environ lookups hash and copy strings each time).
+# A missing key is reported immediately at startup; requests hitting
+# /get_weather without one still get a clean 500 rather than a crash.
+API_KEY = os.environ.get('OPENWEATHER_API_KEY')
+if not API_KEY:
+    logging.warning("OPENWEATHER_API_KEY is not set; /get_weather will return "
+                    "configuration errors until the app is restarted with it.")
+
 # Initialize the Flask application instance
 app = Flask(__name__)
 
+class OrjsonProvider(JSONProvider):
+    """
+    Flask JSON provider backed by orjson.
+
+    The stdlib json module formats floats and escapes keys in pure Python;
+    for responses full of temperatures and comfort indices that shows up in
+    the request time. orjson does the same work in C (with SIMD number
+    formatting), typically several times faster, and `jsonify` call sites
+    need no changes.
+    """
+
+    def dumps(self, obj, **kwargs):
+        # orjson emits bytes; Flask's provider contract expects a string
+        return orjson.dumps(obj).decode()
+
+    def loads(self, s, **kwargs):
+        return orjson.loads(s)
+
+    def response(self, *args, **kwargs):
+        # jsonify funnels through here; hand the orjson bytes straight to
+        # the Response instead of dumps().decode() + re-encode on the way
+        # out. One serialization, zero str round-trips — this covers the
+        # error responses too, which matters when a DB outage makes the
+        # /history error path the hot one.
+        obj = self._prepare_response_obj(args, kwargs)
+        return self._app.response_class(orjson.dumps(obj), mimetype='application/json')
+
+# Route all request parsing and jsonify responses through orjson
+app.json = OrjsonProvider(app)
+
+# Persist compiled Jinja templates as bytecode under a cache directory so a
+# fresh process skips the parse/compile step entirely, and pin auto_reload
+# off so render_template never stats the template file per request. The
+# get_template call warms the in-process compiled-template cache at import
+# time instead of on the first /history hit.
+# With no directory argument, FileSystemBytecodeCache creates a per-user
+# 0700 directory with ownership checks. The cache loads and executes
+# marshalled code objects, so a world-visible fixed path in /tmp would let
+# another local user plant bytecode for the app to run — never point this
+# at a shared, predictable location.
+app.jinja_env.bytecode_cache = jinja2.FileSystemBytecodeCache()
+app.jinja_env.auto_reload = False
+app.jinja_env.get_template('history.html')
+
 # ------------------------------------------------------------------------------
 # 1) Database Setup
 # Functions related to initializing and interacting with the SQLite database.
 # ------------------------------------------------------------------------------
 
+def _open_db():
+    """
+    Opens a connection to 'weather_data.db' with tuned PRAGMAs applied.
+
+    Returns:
+        sqlite3.Connection: A connection with write-ahead logging and
+                            relaxed-but-safe durability settings enabled.
+
+    The PRAGMAs are applied immediately after connecting:
+    - journal_mode=WAL: write-ahead logging avoids the rollback-journal
+      create/delete dance and lets readers proceed while a write is in flight.
+    - synchronous=NORMAL: halves the fsyncs per commit (safe in WAL mode).
+    - temp_store=MEMORY: keeps temporary tables/indices out of the filesystem.
+    - cache_size=-20000: a ~20 MB page cache (negative value = KiB).
+    - mmap_size=256 MB: reads go through memory-mapped pages instead of
+      read() syscalls, cutting per-query syscall overhead.
+    Setting journal_mode is persistent per database file but idempotent,
+    so it is harmless to re-apply on every connect.
+    """
+    # cached_statements sizes sqlite3's per-connection prepared-statement
+    # cache; with long-lived pooled connections the hot statements (history
+    # SELECT, batch INSERTs) stay parsed and planned across requests.
+    conn = sqlite3.connect('weather_data.db', check_same_thread=False,
+                           cached_statements=256)
+    # Explicit DEFERRED isolation (the default, pinned here on purpose):
+    # 'with conn:' blocks open exactly one transaction on the first DML and
+    # commit/rollback on exit, so batch writes can never degrade into
+    # autocommit-per-statement if the code around them is refactored.
+    conn.isolation_level = 'DEFERRED'
+    # Apply all tuning PRAGMAs in one batch right after connecting
+    conn.executescript('''
+    PRAGMA journal_mode=WAL;
+    PRAGMA synchronous=NORMAL;
+    PRAGMA temp_store=MEMORY;
+    PRAGMA cache_size=-20000;
+    PRAGMA mmap_size=268435456;
+    ''')
+    # Name-based row access everywhere; Row subscripting is implemented in C
+    # and write paths that only bind parameters are unaffected.
+    # (A cached-namedtuple factory — lru_cache keyed on cursor.description —
+    # would give attribute access at similar cost, but it still builds a
+    # Python tuple object per row, while sqlite3.Row wraps the raw result
+    # row with no per-row Python construction at all. Since the history
+    # template already uses subscript access, Row stays the faster choice.)
+    conn.row_factory = sqlite3.Row
+    return conn
+
+# Building blocks for the multi-row INSERT used by store_weather_data.
+# SQLite accepts INSERT ... VALUES (...),(...),... so a whole chunk of rows
+# binds into ONE statement, removing even executemany's per-row reset/bind
+# cycle. 62 rows x 8 columns = 496 bound parameters, comfortably under
+# SQLite's default 999-parameter limit.
+_INSERT_PREFIX = '''
+INSERT INTO weather_records
+(city, temperature_kelvin, temperature_celsius, temperature_fahrenheit,
+ humidity, wind_speed, weather_description, comfort_index)
+VALUES '''
+_ROW_PLACEHOLDER = '(?, ?, ?, ?, ?, ?, ?, ?)'
+_INSERT_CHUNK_ROWS = 62
+
+# The /history miss-path SELECT: the most recent 50 records plus the
+# table's high-water mark. The scalar subqueries are evaluated once by
+# SQLite and repeated on every row, so the page rows and the cache key they
+# are consistent with arrive in a single statement — in autocommit mode two
+# separate SELECTs run in separate read transactions, and an insert landing
+# between them would cache the new rows under the old key. Kept at module
+# scope so the exact same SQL text hits the per-connection statement cache
+# on every miss: the parse/plan phase runs once per connection lifetime
+# instead of once per page render.
+HISTORY_PAGE_SQL = '''
+SELECT id, city, temperature_celsius, temperature_fahrenheit, humidity,
+       wind_speed, weather_description, comfort_index, timestamp,
+       (SELECT MAX(id) FROM weather_records) AS _max_id,
+       (SELECT MAX(timestamp) FROM weather_records) AS _max_ts
+FROM weather_records
+ORDER BY timestamp DESC
+LIMIT 50
+'''
+
+@functools.lru_cache(maxsize=None)
+def _multi_insert_sql(row_count):
+    """
+    Returns the multi-VALUES INSERT statement for `row_count` rows.
+
+    Memoized so the same string object comes back for a given row count;
+    sqlite3 keys its per-connection statement cache on the SQL text, so the
+    parsed/planned statement is reused across requests instead of being
+    re-prepared per call. Only a handful of distinct row counts ever occur
+    (full chunks of 62 plus the final partial chunk sizes).
+    """
+    return _INSERT_PREFIX + ",".join([_ROW_PLACEHOLDER] * row_count)
+
+# Thread-local storage holding one long-lived connection per thread.
+# Reusing connections avoids re-parsing the database header, re-acquiring
+# locks and re-applying PRAGMAs on every request, and lets SQLite's
+# per-connection statement cache stay warm across requests.
+_local = threading.local()
+
+def get_conn():
+    """
+    Returns this thread's long-lived database connection.
+
+    Opens a new connection via _open_db() the first time the calling thread
+    asks for one, then returns the same connection on every subsequent call.
+    Callers must NOT close the returned connection; it lives for the
+    lifetime of the thread.
+    """
+    if not hasattr(_local, 'conn'):
+        _local.conn = _open_db()
+    return _local.conn
+
+def _open_db_readonly():
+    """
+    Opens a read-only connection to 'weather_data.db'.
+
+    Returns:
+        sqlite3.Connection: A connection opened with mode=ro; any write
+                            attempt raises sqlite3.OperationalError.
+
+    Read-only connections skip WAL write coordination entirely and make the
+    intent of the read path explicit. The write-side PRAGMAs don't apply
+    here; only the page-cache size is tuned. The database file is guaranteed
+    to exist by the time this runs (_ensure_db at import).
+    """
+    conn = sqlite3.connect('file:weather_data.db?mode=ro', uri=True,
+                           check_same_thread=False, cached_statements=256)
+    conn.executescript('''
+    PRAGMA cache_size=-20000;
+    PRAGMA mmap_size=268435456;
+    ''')
+    # Same name-based row access as the write-side factory
+    conn.row_factory = sqlite3.Row
+    return conn
+
+def get_read_conn():
+    """
+    Returns this thread's long-lived read-only database connection.
+
+    Mirrors get_conn() but hands out a mode=ro connection for the read
+    paths (/history). Multiple read-only connections read the WAL
+    concurrently without ever blocking, or being blocked by, the writer.
+    Callers must NOT close the returned connection.
+    """
+    if not hasattr(_local, 'ro_conn'):
+        _local.ro_conn = _open_db_readonly()
+    return _local.ro_conn
+
+@atexit.register
+def _optimize_db_on_exit():
+    """
+    Refreshes SQLite's query-planner statistics when the process exits.
+
+    'PRAGMA optimize' (bounded by analysis_limit) cheaply re-analyzes the
+    tables that changed, so the next process start plans queries against
+    up-to-date statistics. Failures are ignored: shutdown must not be
+    blocked by a statistics refresh.
+    """
+    try:
+        conn = get_conn()
+        conn.execute('PRAGMA analysis_limit=400')
+        conn.execute('PRAGMA optimize')
+        conn.close()
+    except sqlite3.Error:
+        pass # Best-effort only; nothing actionable at shutdown
+
 def init_db():
     """
     Initializes the SQLite database.
@@ -39,8 +274,8 @@ def init_db():
     """
     conn = None # Initialize connection variable
     try:
-        # Connect to the SQLite database file. Creates the file if it doesn't exist.
-        conn = sqlite3.connect('weather_data.db')
+        # Connect to the SQLite database file (with tuned PRAGMAs). Creates the file if it doesn't exist.
+        conn = _open_db()
         cursor = conn.cursor() # Create a cursor object to execute SQL commands
         # SQL command to create the table if it doesn't exist.
         # Defines columns: id (primary key), city name, temperatures (K, C, F),
@@ -59,88 +294,135 @@ def init_db():
             timestamp DATETIME DEFAULT CURRENT_TIMESTAMP
         )
         ''')
-        conn.commit() # Save the changes (specifically, the table creation)
+        # Indexes matching the read paths: /history orders by timestamp DESC,
+        # and per-city lookups filter on city then order by recency. Without
+        # them every history query scans and sorts the whole table; with them
+        # SQLite walks the index and stops at the LIMIT. The timestamp index
+        # covers every column the history SELECT reads, so the query is
+        # answered entirely from the index with no table row lookups — the
+        # cost is O(LIMIT) regardless of table size, traded against some
+        # write amplification per insert (negligible next to the WAL commit).
+        cursor.execute('DROP INDEX IF EXISTS idx_weather_ts') # Replaced by the covering variant
+        cursor.execute('''
+        CREATE INDEX IF NOT EXISTS idx_weather_ts_cover ON weather_records(
+            timestamp DESC, id, city, temperature_celsius,
+            temperature_fahrenheit, humidity, wind_speed,
+            weather_description, comfort_index
+        )
+        ''')
+        cursor.execute('CREATE INDEX IF NOT EXISTS idx_weather_city_ts ON weather_records(city, timestamp DESC)')
+        conn.commit() # Save the changes (table and index creation)
+        # Refresh planner statistics so the new indexes are chosen with
+        # confidence from the first query onward
+        cursor.execute('PRAGMA optimize')
         logging.info("Database initialized (table 'weather_records' ensured).")
     except sqlite3.Error as e:
         # Log any errors encountered during database initialization
-        logging.error(f"Database initialization error: {e}")
+        logging.error("Database initialization error: %s", e)
     finally:
         # Ensure the database connection is closed, even if errors occurred
         if conn:
             conn.close()
 
-def store_weather_data(weather_data_list):
+def _ensure_db():
+    """
+    Makes sure the database schema exists, issuing DDL only when needed.
+
+    Probes sqlite_master for the 'weather_records' table and calls init_db()
+    only if it is missing. The DDL in init_db is IF NOT EXISTS and therefore
+    harmless to repeat, but every run is still a write transaction that
+    forces a journal sync — under a multi-worker server that's one fsync per
+    worker at boot. The read-only probe costs nothing, so schema creation
+    happens exactly once in the database's lifetime (and once in the master
+    process under gunicorn --preload).
+    """
+    conn = _open_db()
+    try:
+        # Probe for the newest schema object rather than just the table, so
+        # databases created before an index was added still get upgraded
+        # (init_db's DDL is IF NOT EXISTS throughout, so re-running is safe)
+        row = conn.execute(
+            "SELECT 1 FROM sqlite_master WHERE type='index' AND name='idx_weather_ts_cover'"
+        ).fetchone()
+    finally:
+        conn.close()
+    if not row:
+        init_db()
+
+# Ensure the schema exists as soon as the module is imported, whichever
+# entry point (dev server, gunicorn, tests) loads it first
+_ensure_db()
+
+def store_weather_data(valid_records):
     """
     Stores a list of processed weather data dictionaries into the database.
 
     Args:
-        weather_data_list (list): A list of dictionaries, where each dictionary
-                                  represents the processed weather data for one city.
-                                  Expected keys are defined in the INSERT statement.
-                                  Dictionaries containing an 'error' key are skipped.
+        valid_records (list): A list of dictionaries, one per successfully
+                              processed city. Callers are responsible for
+                              filtering out error records first (the
+                              `/get_weather` route already computes exactly
+                              this list); every dictionary must carry the
+                              keys used by the INSERT statement.
 
     Returns:
         bool: True if storage attempt was made (even if 0 records were stored),
-              False if a database or unexpected error occurred during the process.
-
-    Connects to the database, iterates through the provided list,
-    and inserts records that do not contain an 'error' key into the
-    'weather_records' table. Commits all successful inserts as a single transaction.
-    Logs success or failure information.
+              False if a database error occurred during the process. Errors
+              other than sqlite3.Error are not caught here and propagate to
+              the caller.
+
+    Uses this thread's pooled connection (via get_conn()) and inserts the
+    records in chunks of up to 62 rows, each chunk bound into one multi-row
+    `INSERT ... VALUES (...),(...)` statement, all inside one transaction
+    opened by the connection context manager. The whole batch therefore
+    pays one commit (fsync) and a handful of statement steps instead of one
+    round trip per record. Logs success or failure information.
     """
-    conn = None # Initialize connection variable
     try:
-        # Connect to the SQLite database
-        conn = sqlite3.connect('weather_data.db')
-        cursor = conn.cursor() # Get a cursor object
-        stored_count = 0 # Counter for successfully stored records
-        # Iterate through each city's data dictionary in the input list
-        for city_data in weather_data_list:
-            # Only store records that do NOT have an 'error' key, indicating successful processing
-            if 'error' not in city_data:
-                # Execute the SQL INSERT command with parameterized query to prevent SQL injection
-                cursor.execute('''
-                INSERT INTO weather_records
-                (city, temperature_kelvin, temperature_celsius, temperature_fahrenheit,
-                 humidity, wind_speed, weather_description, comfort_index)
-                VALUES (?, ?, ?, ?, ?, ?, ?, ?)
-                ''', (
-                    # Provide the values corresponding to the placeholders (?)
-                    city_data['city_name'],
-                    city_data['temp_kelvin'],
-                    city_data['temp_celsius'],
-                    city_data['temp_fahrenheit'],
-                    city_data['humidity'],
-                    city_data['wind_speed'],
-                    city_data['weather_desc'],
-                    city_data['comfort_index']
-                ))
-                stored_count += 1 # Increment the counter for each successful insert
-
-        conn.commit() # Commit the transaction to save all inserted records
+        # Reuse this thread's long-lived connection (never closed here)
+        conn = get_conn()
+        # Build the parameter tuples; no filtering here, the caller already
+        # passed only the valid records
+        rows = [
+            (
+                city_data['city_name'],
+                city_data['temp_kelvin'],
+                city_data['temp_celsius'],
+                city_data['temp_fahrenheit'],
+                city_data['humidity'],
+                city_data['wind_speed'],
+                city_data['weather_desc'],
+                city_data['comfort_index']
+            )
+            for city_data in valid_records
+        ]
+        stored_count = 0 # Rows actually inserted (from cursor.rowcount)
+        if rows:
+            # The connection context manager opens one transaction for the
+            # whole batch, commits on success and rolls back on exception,
+            # so every row still shares a single commit. Each chunk of up
+            # to 62 rows binds into a single multi-VALUES statement.
+            with conn:
+                for start in range(0, len(rows), _INSERT_CHUNK_ROWS):
+                    chunk = rows[start:start + _INSERT_CHUNK_ROWS]
+                    # Flatten the chunk's tuples into one parameter sequence
+                    flat = [value for row in chunk for value in row]
+                    cursor = conn.execute(_multi_insert_sql(len(chunk)), flat)
+                    stored_count += cursor.rowcount # Inserted rows per SQLite
 
         # Log the outcome of the storage operation
         if stored_count > 0:
-            logging.info(f"Successfully stored weather data for {stored_count} locations.")
+            logging.info("Successfully stored weather data for %d locations.", stored_count)
         else:
             # This case happens if the input list was empty or contained only error records
             logging.info("No new valid weather records to store.")
         return True # Indicate successful execution of the storage process
 
     except sqlite3.Error as e:
-        # Log specific SQLite errors
-        logging.error(f"Database error storing data: {e}")
-        # Optionally rollback changes if needed, though commit happens only once at the end
-        # if conn: conn.rollback()
+        # Log specific SQLite errors; the 'with conn:' block has already
+        # rolled the transaction back by the time we get here
+        logging.error("Database error storing data: %s", e)
         return False # Indicate failure due to database error
-    except Exception as e:
-        # Log any other unexpected errors
-        logging.error(f"Unexpected error storing data: {e}")
-        return False # Indicate failure due to unexpected error
-    finally:
-        # Ensure the database connection is always closed
-        if conn:
-            conn.close()
 
 # ------------------------------------------------------------------------------
 # 2) Weather & Geocoding Logic
@@ -148,6 +430,40 @@ def store_weather_data(weather_data_list):
 # including geocoding and weather retrieval, plus data processing helpers.
 # ------------------------------------------------------------------------------
 
+# Persistent HTTP session shared by all API calls. Keep-alive reuses the
+# TCP/TLS connection to api.openweathermap.org across calls (and across the
+# worker threads), so each city no longer pays a fresh TLS handshake for the
+# geocode and weather requests. The pool is sized to comfortably cover the
+# thread-pool worker count, and transient upstream errors are retried with
+# a short backoff.
+SESSION = requests.Session()
+_adapter = requests.adapters.HTTPAdapter(
+    pool_connections=16,  # Number of distinct hosts to keep pools for
+    pool_maxsize=32,      # Connections kept alive per host
+    max_retries=requests.adapters.Retry(
+        total=2,                        # At most two retries per request
+        backoff_factor=0.3,             # 0.3s, 0.6s between attempts
+        status_forcelist=[502, 503, 504] # Retry only transient upstream errors
+    )
+)
+SESSION.mount('https://', _adapter)
+SESSION.mount('http://', _adapter)
+
+# Prebuilt URL templates for the two OWM endpoints. The fixed query
+# parameters are baked into the string once, so each call only appends its
+# variable parts with an f-string instead of building and URL-encoding a
+# params dict. The API key is a hex-ish string and needs no encoding; the
+# free-form geocode query is quoted at the call site.
+# Cheap validity check applied to each location query before any HTTP call:
+# at least two characters drawn from letters (including Latin accented
+# ranges, e.g. "São Paulo", "Zürich"), spaces, commas, periods, apostrophes
+# and hyphens. Obvious garbage like "!!!" or single characters is rejected
+# locally instead of burning a geocode round-trip (plus fallback retries).
+_VALID_Q = re.compile(r"[A-Za-zÀ-ɏ .,'\-]{2,}")
+
+_GEO_BASE = "http://api.openweathermap.org/geo/1.0/direct?limit=1&appid="
+_WX_BASE = "https://api.openweathermap.org/data/2.5/weather?units=standard&appid="
+
 # Set of recognized US state abbreviations used for geocoding fallbacks
 US_STATE_ABBREVS = {
     "AL","AK","AZ","AR","CA","CO","CT","DE","FL","GA",
@@ -164,6 +480,41 @@ COUNTRY_SYNONYMS = {
     "UK": "GB" # United Kingdom -> Great Britain (as used by OWM country codes)
 }
 
+@functools.lru_cache(maxsize=4096)
+def _geocode_cached(query_norm, api_key):
+    """
+    Cached core of the OWM Geocoding API call.
+
+    Args:
+        query_norm (str): A normalized (stripped, lowercased) location query.
+        api_key (str): The OWM API key.
+
+    Returns:
+        tuple or None: A (lat, lon, country, state, name) tuple for the best
+                       match, or None if the API returned no results.
+                       Can raise requests.exceptions.RequestException on
+                       API call failure (failures are NOT cached).
+
+    Coordinates for a given city never change, so results are memoized in an
+    LRU cache: repeat queries for popular cities skip the geocode HTTP
+    round-trip entirely. Only the small parsed tuple is cached (immutable,
+    so it is safe to share between calls), not the raw response.
+    """
+    # Build the final URL from the prebuilt template; only the free-form
+    # query needs URL-encoding (limit=1 picks the best match)
+    geocode_url = f"{_GEO_BASE}{api_key}&q={quote(query_norm)}"
+    # Make the GET request through the shared keep-alive session
+    resp = SESSION.get(geocode_url)
+    # Raise an HTTPError exception for bad status codes (4xx or 5xx)
+    resp.raise_for_status()
+    results = resp.json()
+    # No match: cache the miss too, so repeated bad queries stay cheap
+    if not results:
+        return None
+    top = results[0] # Best (and only, limit=1) geocoding match
+    return (top['lat'], top['lon'], top.get('country'),
+            top.get('state'), top.get('name'))
+
 def direct_geocode(query, api_key):
     """
     Calls the OpenWeatherMap (OWM) Geocoding API (direct endpoint).
@@ -177,23 +528,25 @@ def direct_geocode(query, api_key):
               Returns an empty list ([]) if no results are found.
               Can raise requests.exceptions.RequestException on API call failure.
 
-    Fetches coordinates and location details for the given query string.
-    Uses 'limit=1' to get only the most relevant result.
-    """
-    # OWM Geocoding API endpoint URL
-    geocode_url = "http://api.openweathermap.org/geo/1.0/direct"
-    # Parameters for the API request
-    geocode_params = {
-        'q': query,      # The location query string
-        'limit': 1,      # Limit results to the best match
-        'appid': api_key # The API key for authentication
-    }
-    # Make the GET request to the API
-    resp = requests.get(geocode_url, params=geocode_params)
-    # Raise an HTTPError exception for bad status codes (4xx or 5xx)
-    resp.raise_for_status()
-    # Parse the JSON response and return it (expected to be a list)
-    return resp.json()
+    Normalizes the query (the geocode API is case-insensitive) and serves the
+    result from the in-process LRU cache when possible; only cache misses hit
+    the network. Uses 'limit=1' to get only the most relevant result.
+    """
+    # Normalize so "Boston, MA" and "boston, ma" share one cache entry
+    cached = _geocode_cached(query.strip().lower(), api_key)
+    if cached is None:
+        return [] # Preserve the "no results" shape of the raw API response
+    lat, lon, country, state, name = cached
+    # Rebuild the single-result list shape callers expect
+    return [{'lat': lat, 'lon': lon, 'country': country,
+             'state': state, 'name': name}]
+
+# Short-TTL cache for weather responses. Weather doesn't change meaningfully
+# within a few minutes, so repeat lookups for the same (rounded) coordinates
+# are served from memory instead of hitting the OWM API again. The lock keeps
+# check-then-fill atomic across the fetch worker threads.
+_WX_CACHE = cachetools.TTLCache(maxsize=2048, ttl=300) # 5-minute entries
+_WX_LOCK = threading.Lock()
 
 def get_weather_by_latlon(lat, lon, api_key):
     """
@@ -208,23 +561,37 @@ def get_weather_by_latlon(lat, lon, api_key):
         dict: A dictionary containing the weather data from the OWM API.
               Can raise requests.exceptions.RequestException on API call failure.
 
+    Results are cached for five minutes keyed on coordinates rounded to two
+    decimal places (~1 km), so nearby/repeat queries skip the HTTP round-trip
+    entirely. Callers receive an independent deep copy of the cached response,
+    because finalize_weather_data mutates the returned dictionary in place.
     Uses the OWM /data/2.5/weather endpoint. 'units=standard' means temperature in Kelvin.
     """
-    # OWM Current Weather API endpoint URL
-    weather_url = "https://api.openweathermap.org/data/2.5/weather"
-    # Parameters for the API request
-    weather_params = {
-        'lat': lat,        # Latitude of the location
-        'lon': lon,        # Longitude of the location
-        'appid': api_key,  # The API key for authentication
-        'units': 'standard' # Request temperature in Kelvin (default)
-    }
-    # Make the GET request to the API
-    weather_resp = requests.get(weather_url, params=weather_params)
+    # Round the coordinates so tiny geocoding jitter still hits the cache
+    cache_key = (round(lat, 2), round(lon, 2))
+    with _WX_LOCK:
+        cached = _WX_CACHE.get(cache_key)
+        if cached is not None:
+            # Cache hit: hand back a private copy, keeping the cached
+            # original safe from the caller's in-place enrichment.
+            return copy.deepcopy(cached)
+
+    # Cache miss: fetch from the API (outside the lock, so a slow HTTP call
+    # doesn't serialize the other worker threads).
+    # Build the final URL from the prebuilt template; lat/lon are floats and
+    # need no encoding ('units=standard' means temperature in Kelvin)
+    weather_url = f"{_WX_BASE}{api_key}&lat={lat}&lon={lon}"
+    # Make the GET request through the shared keep-alive session
+    weather_resp = SESSION.get(weather_url)
     # Raise an HTTPError exception for bad status codes (4xx or 5xx)
     weather_resp.raise_for_status()
-    # Parse the JSON response and return it (expected to be a dictionary)
-    return weather_resp.json()
+    # Parse the JSON response (expected to be a dictionary)
+    weather_data = weather_resp.json()
+    with _WX_LOCK:
+        # Store a pristine copy; concurrent misses for the same key simply
+        # overwrite each other with equivalent data.
+        _WX_CACHE[cache_key] = copy.deepcopy(weather_data)
+    return weather_data
 
 def finalize_weather_data(geocode_data, api_key):
     """
@@ -280,9 +647,9 @@ def try_geocode_fallbacks(location_query, api_key):
         api_key (str): The OWM API key.
 
     Returns:
-        dict or None: An enriched weather data dictionary if a fallback query
-                      successfully geocodes and fetches weather. Returns None if
-                      all fallback attempts fail or result in errors.
+        list or None: The geocoding result list if a fallback query
+                      successfully geocodes. Returns None if all fallback
+                      attempts fail or result in errors.
 
     Implements two specific fallback strategies:
     1.  Country Synonym: If the query ends with a known synonym (like "UK"),
@@ -290,110 +657,210 @@ def try_geocode_fallbacks(location_query, api_key):
     2.  US State Abbreviation: If the query ends with a recognized US state
         abbreviation (like "MA"), append ", US" and try geocoding again.
     """
-    # Split the query into parts based on commas, stripping whitespace
-    parts = [p.strip() for p in location_query.split(",")]
+    # Split off only the last comma-separated token: both fallbacks key off
+    # the query's final part, so one rpartition (no intermediate list of
+    # stripped parts) is enough to drive both checks.
+    head, sep, tail = location_query.rpartition(",")
+    # No comma at all means no "City, Country/State" structure to rewrite
+    if not sep:
+        return None
+    # Normalize the last part once: uppercase, no periods, no whitespace
+    tail_norm = tail.strip().upper().replace(".", "")
 
     # --- Fallback (A): Country Synonym (e.g., "UK" -> "GB") ---
-    # Check if the query has at least two parts (e.g., "City, Country")
-    if len(parts) >= 2:
-        # Get the last part (potential country code), convert to uppercase, remove periods
-        last_part = parts[-1].upper().replace(".", "")
-        # Check if this last part is a key in our COUNTRY_SYNONYMS dictionary
-        if last_part in COUNTRY_SYNONYMS:
-            # Construct the fallback query by replacing the last part with the synonym value
-            fallback_query = ",".join(parts[:-1]) + f",{COUNTRY_SYNONYMS[last_part]}"
-            logging.info(f"Attempting fallback for country synonym: '{location_query}' => '{fallback_query}'")
-            try:
-                # Attempt geocoding with the modified query
-                geo_data = direct_geocode(fallback_query, api_key)
-                # If the fallback geocoding returns results (is not empty)
-                if geo_data:
-                    # Fetch and finalize weather data using these results
-                    return finalize_weather_data(geo_data, api_key)
-            except requests.exceptions.RequestException as e:
-                logging.warning(f"Fallback A request error for '{fallback_query}': {e}")
-            except Exception as e:
-                logging.warning(f"Fallback A unexpected error for '{fallback_query}': {e}")
-
+    if tail_norm in COUNTRY_SYNONYMS:
+        # Construct the fallback query by replacing the last part with the synonym value
+        fallback_query = f"{head},{COUNTRY_SYNONYMS[tail_norm]}"
+        logging.info("Attempting fallback for country synonym: '%s' => '%s'", location_query, fallback_query)
+        try:
+            # Attempt geocoding with the modified query
+            geo_data = direct_geocode(fallback_query, api_key)
+            # If the fallback geocoding returns results (is not empty)
+            if geo_data:
+                # Hand the geocoding results back to the caller
+                return geo_data
+        except requests.exceptions.RequestException as e:
+            logging.warning("Fallback A request error for '%s': %s", fallback_query, e)
+        except Exception as e:
+            logging.warning("Fallback A unexpected error for '%s': %s", fallback_query, e)
 
     # --- Fallback (B): US City + State Abbreviation (e.g., "Boston, MA" -> "Boston, MA, US") ---
-    # Check if the query has at least two parts (potential City, State)
-    if len(parts) >= 2:
-        # Get the last part (potential state abbr), uppercase, remove periods
-        possible_state = parts[-1].upper().replace(".", "")
-        # Check if this part is in our set of recognized US state abbreviations
-        if possible_state in US_STATE_ABBREVS:
-            # Construct the fallback query by appending ", US"
-            fallback_query = f"{location_query}, US"
-            logging.info(f"Attempting fallback by adding ', US': '{location_query}' => '{fallback_query}'")
-            try:
-                # Attempt geocoding with the modified query
-                geo_data = direct_geocode(fallback_query, api_key)
-                # If the fallback geocoding returns results
-                if geo_data:
-                     # Fetch and finalize weather data using these results
-                    return finalize_weather_data(geo_data, api_key)
-            except requests.exceptions.RequestException as e:
-                logging.warning(f"Fallback B request error for '{fallback_query}': {e}")
-            except Exception as e:
-                logging.warning(f"Fallback B unexpected error for '{fallback_query}': {e}")
+    elif tail_norm in US_STATE_ABBREVS:
+        # Construct the fallback query by appending ", US"
+        fallback_query = f"{location_query}, US"
+        logging.info("Attempting fallback by adding ', US': '%s' => '%s'", location_query, fallback_query)
+        try:
+            # Attempt geocoding with the modified query
+            geo_data = direct_geocode(fallback_query, api_key)
+            # If the fallback geocoding returns results
+            if geo_data:
+                # Hand the geocoding results back to the caller
+                return geo_data
+        except requests.exceptions.RequestException as e:
+            logging.warning("Fallback B request error for '%s': %s", fallback_query, e)
+        except Exception as e:
+            logging.warning("Fallback B unexpected error for '%s': %s", fallback_query, e)
 
     # If neither fallback strategy yielded results, return None
     return None
 
-def get_weather_data_geocoded(location_query, api_key):
+def geocode_phase(location_query, api_key):
     """
-    Main function to get weather data for a location query using geocoding.
+    Geocoding phase: resolves a location query to geocoding results.
 
     Args:
         location_query (str): The user-provided location string.
         api_key (str): The OWM API key.
 
     Returns:
-        dict or None: An enriched weather data dictionary if successful,
-                      otherwise None if geocoding fails (even with fallbacks)
-                      or if an API error occurs.
-
-    Orchestrates the process:
-    1. Tries direct geocoding on the input query.
-    2. If direct fails, attempts fallback strategies via `try_geocode_fallbacks`.
-    3. If any geocoding attempt succeeds, uses `finalize_weather_data` to get
-       and enrich the weather data.
-    4. Handles potential request errors and logs outcomes.
+        list or None: The geocoding result list (direct or via fallbacks),
+                      or None if the location can't be resolved or an API
+                      error occurs.
+
+    Tries direct geocoding first, then the fallback strategies in
+    `try_geocode_fallbacks`. Keeping this phase separate from the weather
+    fetch lets `/get_weather` geocode all cities first, deduplicate by
+    coordinates, and only then fetch weather for the unique locations.
     """
     try:
         # --- First Attempt: Direct Geocoding ---
-        logging.info(f"Attempting direct geocode for: '{location_query}'")
+        logging.info("Attempting direct geocode for: '%s'", location_query)
         geo_data = direct_geocode(location_query, api_key)
         # If direct geocoding is successful (returns a non-empty list)
         if geo_data:
-            logging.info(f"Direct geocode successful for '{location_query}'. Fetching weather.")
-            # Fetch and enrich weather data using the geocoding result
-            return finalize_weather_data(geo_data, api_key)
+            logging.info("Direct geocode successful for '%s'.", location_query)
+            return geo_data
 
         # --- Second Attempt: Fallbacks ---
         # If direct geocoding returned no results, log and try fallbacks
-        logging.info(f"Direct geocode failed for '{location_query}'. Trying fallbacks...")
-        weather_data = try_geocode_fallbacks(location_query, api_key)
-        # If any fallback was successful and returned weather data
-        if weather_data:
-            logging.info(f"Fallback geocode successful for '{location_query}'.")
-            return weather_data # Return the data obtained via fallback
+        logging.info("Direct geocode failed for '%s'. Trying fallbacks...", location_query)
+        geo_data = try_geocode_fallbacks(location_query, api_key)
+        # If any fallback was successful and returned geocoding results
+        if geo_data:
+            logging.info("Fallback geocode successful for '%s'.", location_query)
+            return geo_data
 
         # --- Failure Case ---
         # If both direct and fallback geocoding failed
-        logging.warning(f"All geocoding attempts failed for '{location_query}'.")
+        logging.warning("All geocoding attempts failed for '%s'.", location_query)
         return None # Indicate failure to find the location
 
     except requests.exceptions.RequestException as req_err:
         # Handle errors during the API requests (e.g., network issues, 4xx/5xx errors)
-        logging.error(f"API Request error during geocoding/weather fetch for '{location_query}': {req_err}")
+        logging.error("API Request error during geocoding for '%s': %s", location_query, req_err)
         return None # Indicate failure due to API error
     except Exception as e:
         # Handle any other unexpected errors during the process
-        logging.error(f"Unexpected error in get_weather_data_geocoded for '{location_query}': {e}")
+        logging.error("Unexpected error in geocode_phase for '%s': %s", location_query, e)
         return None # Indicate failure due to unexpected error
 
+def weather_phase(geocode_data, api_key):
+    """
+    Weather phase: fetches and enriches weather data for geocoding results.
+
+    Args:
+        geocode_data (list): A non-empty geocoding result list, as returned
+                             by `geocode_phase`.
+        api_key (str): The OWM API key.
+
+    Returns:
+        dict or None: The enriched weather data dictionary, or None if the
+                      weather fetch fails.
+
+    Thin error-handling wrapper around `finalize_weather_data`; the actual
+    HTTP call inside is served from the short-TTL weather cache when the
+    coordinates were already fetched (e.g. pre-warmed by `/get_weather`).
+    """
+    try:
+        return finalize_weather_data(geocode_data, api_key)
+    except requests.exceptions.RequestException as req_err:
+        # Handle errors during the weather API request
+        logging.error("API Request error during weather fetch: %s", req_err)
+        return None
+    except Exception as e:
+        # Handle any other unexpected errors during the process
+        logging.error("Unexpected error in weather_phase: %s", e)
+        return None
+
+@dataclass(slots=True)
+class WxParsed:
+    """
+    The fields /get_weather needs from an (enriched) OWM weather payload.
+
+    OWM's response schema is fixed, so rather than walking the nested dicts
+    with chained .get(..., {}) calls per field, the payload is parsed once
+    into this slotted dataclass. Slot access afterwards is a C-level
+    attribute load instead of a dict lookup per read.
+    """
+    temp_kelvin: float          # Temperature in Kelvin
+    humidity: int               # Relative humidity percentage
+    wind_speed: float           # Wind speed (m/s)
+    weather_desc: str           # Weather condition description
+    city_name: str              # City name (from geocoding enrichment)
+    country_code: Optional[str] # Country code (from geocoding enrichment)
+    state: Optional[str]        # State name, if applicable
+
+def parse_owm(weather_data):
+    """
+    Parses an enriched OWM weather payload into a WxParsed instance.
+
+    Args:
+        weather_data (dict): The weather data dictionary from
+                             finalize_weather_data.
+
+    Returns:
+        WxParsed or None: The parsed payload, or None if required fields are
+                          missing, null, or the structure is malformed.
+
+    Uses direct subscripts inside one try/except instead of per-field .get
+    chains: the happy path (well-formed payload, by far the common case)
+    pays no default-object allocations, and any malformed shape lands in
+    the single except clause.
+    """
+    try:
+        main_info = weather_data["main"]
+        sys_info = weather_data.get("sys", {})
+        weather_details = weather_data.get("weather")
+        parsed = WxParsed(
+            temp_kelvin=main_info["temp"],
+            humidity=main_info["humidity"],
+            wind_speed=weather_data["wind"]["speed"],
+            # Description is genuinely optional in practice; default it
+            weather_desc=(weather_details[0].get("description", "N/A")
+                          if weather_details else "N/A"),
+            city_name=weather_data["name"],
+            country_code=sys_info.get("country"),
+            state=sys_info.get("state"),
+        )
+    except (KeyError, IndexError, TypeError):
+        return None # Malformed payload shape
+    # Explicit nulls or an empty city name count as incomplete data too
+    if None in (parsed.temp_kelvin, parsed.humidity, parsed.wind_speed) \
+            or not parsed.city_name:
+        return None
+    return parsed
+
+def get_weather_data_geocoded(location_query, api_key):
+    """
+    Main function to get weather data for a location query using geocoding.
+
+    Args:
+        location_query (str): The user-provided location string.
+        api_key (str): The OWM API key.
+
+    Returns:
+        dict or None: An enriched weather data dictionary if successful,
+                      otherwise None if geocoding fails (even with fallbacks)
+                      or if an API error occurs.
+
+    Convenience composition of `geocode_phase` and `weather_phase` for
+    callers that want the whole pipeline for a single query.
+    """
+    geo_data = geocode_phase(location_query, api_key)
+    if not geo_data:
+        return None # Geocoding failed (already logged by geocode_phase)
+    return weather_phase(geo_data, api_key)
+
 def convert_temperatures(kelvin):
     """
     Converts temperature from Kelvin to Celsius and Fahrenheit.
@@ -407,11 +874,11 @@ def convert_temperatures(kelvin):
     """
     if kelvin is None:
         return None, None # Handle missing input temperature
-    # Formula for Kelvin to Celsius
-    celsius = kelvin - 273.15
-    # Formula for Celsius to Fahrenheit
-    fahrenheit = (celsius * 9/5) + 32
-    return celsius, fahrenheit
+    # Kelvin to Celsius, and Kelvin straight to Fahrenheit with the
+    # conversion constants folded together (K * 9/5 - 459.67 is the same
+    # formula as (K - 273.15) * 9/5 + 32 with the arithmetic pre-combined,
+    # skipping the intermediate Celsius store/load and one multiply)
+    return kelvin - 273.15, kelvin * 1.8 - 459.67
 
 def calculate_comfort_index(temp_celsius, humidity, wind_speed):
     """
@@ -455,6 +922,40 @@ def calculate_comfort_index(temp_celsius, humidity, wind_speed):
     # Return the calculated index
     return comfort_index
 
+def compute_derived_batch(temps_kelvin, humidities, wind_speeds):
+    """
+    Vectorized batch version of convert_temperatures + calculate_comfort_index.
+
+    Args:
+        temps_kelvin (list): Temperatures in Kelvin, one per city.
+        humidities (list): Relative humidity percentages, one per city.
+        wind_speeds (list): Wind speeds (m/s), one per city.
+
+    Returns:
+        tuple: Three lists (celsius, fahrenheit, comfort_index) aligned with
+               the inputs.
+
+    For multi-city requests the per-city scalar math is interpreter-bound:
+    each city pays Python-level clamps, divides and multiplies. Computing the
+    whole batch as NumPy arrays runs those operations in single C loops.
+    Inputs must already be validated (no None values); callers filter first.
+    The formulas mirror the scalar helpers exactly (float64, same constants).
+    """
+    # Assemble the input arrays once
+    k = np.asarray(temps_kelvin, dtype=np.float64)
+    h = np.asarray(humidities, dtype=np.float64)
+    w = np.asarray(wind_speeds, dtype=np.float64)
+    # Temperature conversions (same folded constants as convert_temperatures)
+    c = k - 273.15
+    f = k * 1.8 - 459.67
+    # Normalized components (same clamps/weights as calculate_comfort_index)
+    normalized_temp = np.clip(c, 0, 40) / 40
+    normalized_humidity = 1 - h / 100
+    normalized_wind = 1 - np.minimum(w, 10) / 10
+    comfort = 0.5 * normalized_temp + 0.3 * normalized_humidity + 0.2 * normalized_wind
+    # Hand plain Python floats back to the dict-building caller
+    return c.tolist(), f.tolist(), comfort.tolist()
+
 # ------------------------------------------------------------------------------
 # 3) Flask Routes
 # Define the web application's endpoints (URLs) and their corresponding logic.
@@ -496,11 +997,11 @@ def get_weather():
     location_queries = data.get('cities', [])
     # Validate that 'cities' is a non-empty list
     if not isinstance(location_queries, list) or not location_queries:
-        logging.warning(f"Received invalid 'cities' value: {location_queries}")
+        logging.warning("Received invalid 'cities' value: %s", location_queries)
         return jsonify({'error': 'Invalid request. "cities" must be a non-empty list of strings.'}), 400
 
-    # Retrieve the OpenWeatherMap API key from environment variables
-    api_key = os.environ.get('OPENWEATHER_API_KEY')
+    # The OpenWeatherMap API key was read once at import (see API_KEY)
+    api_key = API_KEY
     # Check if the API key is set
     if not api_key:
         logging.error("API Key not found. OPENWEATHER_API_KEY environment variable is not set.")
@@ -510,21 +1011,75 @@ def get_weather():
     # --- Process Each Location Query ---
     all_results_data = [] # List to hold results (or errors) for each city
 
-    # Iterate through the list of location strings provided by the user
-    for location_query in location_queries:
-        # Remove leading/trailing whitespace from the query
-        original_input = location_query.strip()
-        # Skip empty strings after stripping
-        if not original_input:
-            continue # Move to the next query in the list
-
-        # Call the main function to get weather data using geocoding and fallbacks
-        weather_data = get_weather_data_geocoded(original_input, api_key)
+    # Strip whitespace and drop empty strings before dispatching any work
+    inputs = [q.strip() for q in location_queries if q.strip()]
+
+    # Reject queries that can't possibly geocode before spending any HTTP
+    # round-trips on them; only plausibly-valid inputs reach the thread
+    # pool. The sentinel marks rejected slots so the response still comes
+    # back in the caller's input order.
+    _rejected = object()
+    valid_flags = [_VALID_Q.fullmatch(q) is not None for q in inputs]
+    to_fetch = [q for q, ok in zip(inputs, valid_flags) if ok]
+
+    # Fetch weather data for all cities in parallel, in two pool-mapped
+    # phases: first geocode every query, then fetch weather. Batching each
+    # endpoint's calls together fills the keep-alive connection pipeline
+    # better than interleaving geocode/weather per city, and lets us
+    # deduplicate weather fetches when several queries resolve to the same
+    # coordinates. executor.map preserves input order throughout.
+    if to_fetch:
+        with ThreadPoolExecutor(max_workers=min(16, len(to_fetch))) as executor:
+            # Phase 1: geocode all queries (None where geocoding failed)
+            geos = list(executor.map(
+                lambda q: geocode_phase(q, api_key), to_fetch))
+
+            # Deduplicate by coordinates rounded to two decimals: queries
+            # that resolved to the same spot need only one weather fetch.
+            unique_geos = {}
+            for geo in geos:
+                if geo:
+                    key = (round(geo[0]['lat'], 2), round(geo[0]['lon'], 2))
+                    unique_geos.setdefault(key, geo)
+
+            # Phase 2: fetch weather for the unique locations in parallel.
+            # This warms the short-TTL weather cache, so the per-query
+            # finalization below is served from memory.
+            list(executor.map(
+                lambda g: weather_phase(g, api_key), unique_geos.values()))
+
+            # Attach an enriched weather dict (or None) to each fetched
+            # query, preserving input order and per-query location naming.
+            fetched_valid = [weather_phase(geo, api_key) if geo else None
+                             for geo in geos]
+    else:
+        fetched_valid = []
+
+    # Re-interleave fetched results with the rejected slots so `fetched`
+    # lines up one-to-one with `inputs`
+    _fetched_iter = iter(fetched_valid)
+    fetched = [next(_fetched_iter) if ok else _rejected for ok in valid_flags]
+
+    # Successful results whose derived values still need computing; filled
+    # during the loop, processed in one vectorized batch afterwards
+    pending_derived = []
+
+    # Process each (input, fetched data) pair with the same logic as before
+    for original_input, weather_data in zip(inputs, fetched):
+        # --- Handle Rejected Input ---
+        # The validator short-circuited this query before any HTTP call
+        if weather_data is _rejected:
+            logging.warning("Rejected invalid location format: '%s'", original_input)
+            all_results_data.append({
+                'original_input': original_input,
+                'error': f"Invalid location format: '{original_input}'. Use letters, spaces, commas, periods, apostrophes or hyphens."
+            })
+            continue # Move to the next query
 
         # --- Handle Failed Fetch ---
-        # If get_weather_data_geocoded returned None (failed for any reason)
+        # If the fetch phases returned None (failed for any reason)
         if not weather_data:
-            logging.warning(f"Failed to get weather data for input: '{original_input}'")
+            logging.warning("Failed to get weather data for input: '%s'", original_input)
             # Append an error dictionary to the results list for this input
             all_results_data.append({
                 'original_input': original_input,
@@ -534,61 +1089,49 @@ def get_weather():
 
         # --- Process Successful Fetch ---
         try:
-            # Extract relevant information from the returned weather_data dictionary.
-            # Use .get() with default values (like {} or [{}]) to prevent KeyErrors if data is malformed.
-            main_info = weather_data.get("main", {})
-            temp_kelvin = main_info.get("temp")       # Temperature in Kelvin
-            humidity = main_info.get("humidity")      # Humidity percentage
-            weather_details = weather_data.get("weather", [{}]) # List of weather conditions (usually one)
-            # Get description from the first weather condition, default to "N/A"
-            weather_desc = weather_details[0].get("description", "N/A") if weather_details else "N/A"
-            wind_info = weather_data.get("wind", {})
-            wind_speed = wind_info.get("speed")       # Wind speed
-            # Location details added during finalization step
-            city_name_api = weather_data.get("name")  # City name (from geocoding)
-            country_code = weather_data.get("sys", {}).get("country") # Country code (from geocoding)
-            state_name = weather_data.get("sys", {}).get("state")     # State name (from geocoding, if applicable)
+            # Parse the fixed-schema payload once into a slotted dataclass;
+            # everything below reads cheap attributes instead of chained
+            # dict .get() lookups
+            parsed = parse_owm(weather_data)
 
             # --- Data Validation ---
-            # Check if essential data points were successfully extracted
-            if None in [temp_kelvin, humidity, wind_speed] or not city_name_api:
-                logging.warning(f"Incomplete data received from API for '{original_input}'. Raw: {weather_data}")
+            # parse_owm returns None when essential fields are missing/null
+            if parsed is None:
+                logging.warning("Incomplete data received from API for '%s'. Raw: %s", original_input, weather_data)
                 all_results_data.append({
                     'original_input': original_input,
-                    'city_name': city_name_api or "Unknown", # Use extracted name or default
-                    'country_code': country_code,
-                    'state': state_name,
+                    'city_name': weather_data.get('name') or "Unknown", # Use extracted name or default
+                    'country_code': weather_data.get('sys', {}).get('country'),
+                    'state': weather_data.get('sys', {}).get('state'),
                     'error': 'Incomplete data received from the weather service API.'
                 })
                 continue # Move to the next query
 
-            # --- Calculate Derived Data ---
-            # Convert temperature from Kelvin to Celsius and Fahrenheit
-            temp_celsius, temp_fahrenheit = convert_temperatures(temp_kelvin)
-            # Calculate the custom comfort index
-            comfort = calculate_comfort_index(temp_celsius, humidity, wind_speed)
-
             # --- Format Result ---
-            # Create a dictionary containing the processed data for this city
+            # Create a dictionary containing the processed data for this city.
+            # The derived values (Celsius, Fahrenheit, comfort index) are
+            # filled in by a single vectorized pass after the loop.
             city_result = {
-                'original_input': original_input, # The user's original input string
-                'city_name': city_name_api,     # Best available city name
-                'country_code': country_code,   # Country code
-                'state': state_name,            # State name (if available)
-                'weather_desc': weather_desc,   # Weather condition description
-                'temp_kelvin': temp_kelvin,     # Temp in K
-                'temp_celsius': temp_celsius,   # Temp in C
-                'temp_fahrenheit': temp_fahrenheit, # Temp in F
-                'humidity': humidity,           # Humidity %
-                'wind_speed': wind_speed,       # Wind speed (m/s likely)
-                'comfort_index': comfort        # Custom comfort index
+                'original_input': original_input,     # The user's original input string
+                'city_name': parsed.city_name,      # Best available city name
+                'country_code': parsed.country_code, # Country code
+                'state': parsed.state,              # State name (if available)
+                'weather_desc': parsed.weather_desc, # Weather condition description
+                'temp_kelvin': parsed.temp_kelvin,  # Temp in K
+                'temp_celsius': None,               # Temp in C (computed below)
+                'temp_fahrenheit': None,            # Temp in F (computed below)
+                'humidity': parsed.humidity,        # Humidity %
+                'wind_speed': parsed.wind_speed,    # Wind speed (m/s likely)
+                'comfort_index': None               # Custom comfort index (computed below)
             }
-            # Append the successful result to the main list
+            # Append the successful result to the main list and remember it
+            # for the batched derived-data computation
             all_results_data.append(city_result)
+            pending_derived.append(city_result)
 
         except Exception as e:
             # Catch any unexpected errors during the processing of a single city's data
-            logging.error(f"Error processing data for '{original_input}': {e}. Raw API Data: {weather_data}")
+            logging.error("Error processing data for '%s': %s. Raw API Data: %s", original_input, e, weather_data)
             # Append an error dictionary for this city
             all_results_data.append({
                 'original_input': original_input,
@@ -596,12 +1139,27 @@ def get_weather():
             })
             # Continue processing the next city in the request list
 
+    # --- Compute Derived Data (vectorized) ---
+    # One NumPy pass converts temperatures and computes the comfort index for
+    # every successful city at once, instead of scalar math per city.
+    if pending_derived:
+        celsius, fahrenheit, comfort = compute_derived_batch(
+            [r['temp_kelvin'] for r in pending_derived],
+            [r['humidity'] for r in pending_derived],
+            [r['wind_speed'] for r in pending_derived]
+        )
+        # Scatter the computed values back into the result dictionaries
+        for record, c, f, ci in zip(pending_derived, celsius, fahrenheit, comfort):
+            record['temp_celsius'] = c
+            record['temp_fahrenheit'] = f
+            record['comfort_index'] = ci
+
     # --- Store Valid Results ---
     # Filter the results list to get only the dictionaries that represent successful fetches (no 'error' key)
     valid_records_to_store = [record for record in all_results_data if 'error' not in record]
     # If there are any valid records to store
     if valid_records_to_store:
-        logging.info(f"Attempting to store {len(valid_records_to_store)} valid weather records.")
+        logging.info("Attempting to store %d valid weather records.", len(valid_records_to_store))
         # Call the function to store these records in the database
         store_weather_data(valid_records_to_store)
     else:
@@ -611,6 +1169,99 @@ def get_weather():
     # Return the list of all results (including errors) as a JSON response to the client
     return jsonify({'weather_data': all_results_data})
 
+# Cheap freshness probe for the history cache: MAX(id)/MAX(timestamp) are
+# answered straight from the indexes in microseconds, and together they
+# change whenever a new record lands.
+_HISTORY_PROBE_SQL = 'SELECT MAX(id), MAX(timestamp) FROM weather_records'
+
+# Single-entry cache of the rendered history page, keyed on the probe
+# result and holding both the HTML string and its gzip bytes. A hit skips
+# the 50-row SELECT, the whole Jinja render AND the compression; the key
+# changes as soon as a write endpoint inserts a row, so invalidation is
+# implicit. The lock keeps concurrent readers from racing the refill.
+_HISTORY_CACHE = {}
+_HISTORY_CACHE_LOCK = threading.Lock()
+
+# One format-string call emits a whole table row. Bound at module scope so
+# the render loop below is a single C-level str.format per row instead of
+# ~9 template-runtime dispatches (autoescape wrapper, subscript node, cell
+# concat) per cell that Jinja's {% for %} would pay.
+_HISTORY_ROW_FMT = ('<tr><td>{}</td><td>{}</td><td>{}</td><td>{}</td>'
+                    '<td>{}</td><td>{}</td><td>{}</td><td>{}</td></tr>').format
+
+def _cell_2f(value):
+    """Formats a float cell to two decimals, or an empty cell for None."""
+    return f'{value:.2f}' if value is not None else ''
+
+def _cell_2f_na(value):
+    """Formats a float cell to two decimals, or 'N/A' for None."""
+    return f'{value:.2f}' if value is not None else 'N/A'
+
+def _cell_na(value):
+    """Escapes a raw cell value, or substitutes 'N/A' for None."""
+    return markupsafe.escape(value) if value is not None else 'N/A'
+
+def _render_history_rows(records):
+    """
+    Serializes history records straight to an HTML table-body fragment.
+
+    Mirrors the cell formatting the template loop used to do (two-decimal
+    temperatures and comfort index, 'N/A' fallbacks) but in plain Python:
+    escaping happens once per textual cell via markupsafe.escape (the same
+    C speedup Jinja uses) and the rows join into one string. The result is
+    wrapped in Markup so the template can inline it without re-escaping.
+
+    Args:
+        records: An iterable of sqlite3.Row objects from HISTORY_PAGE_SQL.
+
+    Returns:
+        markupsafe.Markup: The concatenated <tr> fragment for the tbody.
+    """
+    return markupsafe.Markup('\n'.join(
+        _HISTORY_ROW_FMT(
+            markupsafe.escape(record['timestamp']),
+            markupsafe.escape(record['city']),
+            _cell_2f(record['temperature_celsius']),
+            _cell_2f(record['temperature_fahrenheit']),
+            _cell_na(record['humidity']),
+            _cell_na(record['wind_speed']),
+            markupsafe.escape(record['weather_description']),
+            _cell_2f_na(record['comfort_index']),
+        )
+        for record in records))
+
+def _history_etag(max_id, max_ts):
+    """
+    Derives a weak ETag for the history page from the freshness probe.
+
+    The MAX(id)/MAX(timestamp) pair already identifies the table state the
+    page was rendered from, so it doubles as the validator: any insert
+    changes it, and identical pairs mean a byte-identical page.
+    """
+    return f'W/"{max_id}-{max_ts}"'
+
+def _history_response(html, gz_bytes, etag):
+    """
+    Builds the /history response, preferring the precompressed body.
+
+    Sends the cached gzip bytes (with Content-Encoding) when the client
+    advertises gzip support — most browsers and proxies do — shipping a
+    fraction of the bytes with zero compression work per request. Clients
+    without gzip support get the plain HTML string. Either way the ETag is
+    attached so the client's next visit can be answered with a bodyless 304.
+    """
+    if 'gzip' in request.headers.get('Accept-Encoding', ''):
+        return Response(gz_bytes, headers={
+            'Content-Encoding': 'gzip',
+            'Content-Type': 'text/html; charset=utf-8',
+            'Vary': 'Accept-Encoding',
+            'ETag': etag,
+        })
+    return Response(html, headers={
+        'Content-Type': 'text/html; charset=utf-8',
+        'ETag': etag,
+    })
+
 @app.route('/history')
 def history():
     """
@@ -618,47 +1269,89 @@ def history():
 
     Retrieves the most recent weather records (up to 50) from the database.
     Renders the 'history.html' template, passing the retrieved records to it for display.
+    The rendered page is memoized against the table's MAX(id)/MAX(timestamp),
+    so steady-state requests cost one index probe plus a dict lookup; any
+    insert changes the key and the next request re-renders.
     """
-    conn = None # Initialize connection variable
     try:
-        # Connect to the database
-        conn = sqlite3.connect('weather_data.db')
-        # Set row_factory to sqlite3.Row to access columns by name (like dictionaries)
-        conn.row_factory = sqlite3.Row
+        # Borrow this thread's long-lived READ-ONLY connection; reopening
+        # per request would discard the warm page cache, and the mode=ro
+        # connection reads the WAL concurrently with writers while making
+        # any accidental write on this path fail loudly
+        conn = get_read_conn()
+        # row_factory is sqlite3.Row already (set by the connection factory)
         cursor = conn.cursor() # Get a cursor object
-        # Execute SQL query to select relevant columns from the weather_records table
-        # Order by timestamp in descending order (most recent first)
-        # Limit the results to the latest 50 entries
-        cursor.execute('''
-        SELECT id, city, temperature_celsius, temperature_fahrenheit, humidity,
-               wind_speed, weather_description, comfort_index, timestamp
-        FROM weather_records
-        ORDER BY timestamp DESC
-        LIMIT 50
-        ''')
-        # Fetch all rows returned by the query and convert each sqlite3.Row object into a standard dictionary
-        records = [dict(row) for row in cursor.fetchall()]
-        # Render the 'history.html' template, passing the list of record dictionaries
-        return render_template('history.html', records=records)
+        # Probe the table's current high-water mark (index-only, microseconds)
+        max_id, max_ts = cursor.execute(_HISTORY_PROBE_SQL).fetchone()
+        cache_key = (max_id, max_ts)
+        etag = _history_etag(max_id, max_ts)
+        # Conditional GET: if the client already holds the current page (its
+        # If-None-Match echoes our ETag), answer 304 with no body at all —
+        # no row SELECT, no render, no bytes shipped. Revisits cost only the
+        # index probe above.
+        if request.headers.get('If-None-Match') == etag:
+            return '', 304, {'ETag': etag}
+        with _HISTORY_CACHE_LOCK:
+            cached = _HISTORY_CACHE.get(cache_key)
+        if cached is not None:
+            # Nothing changed since the last render; serve the cached page
+            # (compressed when the client accepts it)
+            return _history_response(*cached, etag)
+        # Miss: fetch the page rows and the high-water mark they belong to
+        # in one statement (the constant SQL text keeps the statement cache
+        # hitting). Re-keying on the values carried by the rows themselves
+        # means the cached page is always filed under the state it actually
+        # reflects, even if an insert slipped in after the probe above.
+        cursor.execute(HISTORY_PAGE_SQL)
+        first = cursor.fetchone()
+        if first is not None:
+            cache_key = (first['_max_id'], first['_max_ts'])
+            etag = _history_etag(*cache_key)
+            # Chain the peeked row back in front of the cursor: the row
+            # serializer then iterates lazily, pulling one sqlite3.Row at a
+            # time straight from SQLite with no fetchall list materialized.
+            # The extra _max_* columns are simply unused.
+            records = itertools.chain((first,), cursor)
+        else:
+            records = ()
+        # Serialize the rows to an HTML fragment in plain Python (one
+        # str.format per row) and hand the template a single pre-escaped
+        # Markup block, sidestepping ~450 template-runtime dispatches that
+        # a 50-row {% for %} loop with 9 cells would cost.
+        html = render_template('history.html',
+                               rows_html=_render_history_rows(records))
+        # Compress once at fill time; every later hit reuses these bytes
+        gz_bytes = gzip.compress(html.encode(), compresslevel=6)
+        with _HISTORY_CACHE_LOCK:
+            # Keep only the freshest render; older keys can never hit again
+            _HISTORY_CACHE.clear()
+            _HISTORY_CACHE[cache_key] = (html, gz_bytes)
+        return _history_response(html, gz_bytes, etag)
     except Exception as e:
         # Log any errors encountered during database access or template rendering
-        logging.error(f"Error retrieving or rendering history page: {e}")
+        logging.error("Error retrieving or rendering history page: %s", e)
         # Return a JSON error message (though ideally, an error page might be better for a GET request)
         # Or render history.html with an error message variable set.
         return jsonify({'error': f"Failed to retrieve history data: {e}"}), 500
-    finally:
-        # Ensure the database connection is closed
-        if conn:
-            conn.close()
 
 # ------------------------------------------------------------------------------
 # Main Execution Block
 # This code runs only when the script is executed directly (not imported as a module).
 # ------------------------------------------------------------------------------
 if __name__ == '__main__':
-    # Ensure the database and table are ready before starting the app
-    init_db()
-    # Start the Flask development web server
-    # debug=True enables auto-reloading on code changes and detailed error pages (for development only!)
-    # In production, use a proper WSGI server like Gunicorn or Waitress.
-    app.run(debug=True)
\ No newline at end of file
+    # The database and table are ensured at import time (see _ensure_db)
+    if os.environ.get('FLASK_DEBUG'):
+        # Development mode (FLASK_DEBUG=1): Werkzeug dev server with
+        # auto-reloading and detailed error pages. Single-threaded — it
+        # serializes concurrent requests, so never use it in production.
+        app.run(debug=True)
+    else:
+        # Default: waitress, a production WSGI server with keep-alive and a
+        # thread pool. Eight worker threads share the pooled per-thread
+        # SQLite connections and read the WAL concurrently, so /history
+        # throughput scales with cores instead of serializing per request.
+        # (See wsgi.py for the gunicorn/gevent alternative:
+        #  gunicorn -w 4 -k gthread --threads 8 app:app also works.)
+        from waitress import serve
+        logging.info("Serving with waitress on http://127.0.0.1:5000")
+        serve(app, host='127.0.0.1', port=5000, threads=8)
\ No newline at end of file
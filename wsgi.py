@@ -0,0 +1,22 @@
+# wsgi.py
+# Production entry point for running the app under gunicorn with gevent workers:
+#
+#     pip install gunicorn gevent
+#     gunicorn -k gevent -w 4 --worker-connections 1000 wsgi:application
+#
+# gevent monkey-patches blocking socket I/O into cooperative greenlets, so a
+# single worker can hold hundreds of OpenWeatherMap calls in flight at once.
+# The patch MUST be applied before anything imports `requests` (via `app`),
+# otherwise its sockets stay blocking and greenlets serialize on them.
+
+# Import and apply the monkey patch first, before the application module
+from gevent import monkey
+monkey.patch_all()
+
+# Only now import the Flask application (pulls in requests/sqlite3).
+# threading.local is patched to greenlet-local storage, so the per-thread
+# database connections in app.get_conn() become per-greenlet connections
+# (opened with check_same_thread=False, so this is safe). Importing the
+# module also ensures the database schema exists (app._ensure_db), once in
+# the master process under `gunicorn --preload`.
+from app import app as application